@@ -11,22 +11,29 @@ Docker mode requires: pip install testcontainers requests docker
 Live mode requires: HA_LIVE_URL and HA_LIVE_TOKEN environment variables
 """
 
+import asyncio
+import itertools
 import logging
 import os
 import shutil
+import socket
 import stat
 import sys
 import tempfile
 import time
 from pathlib import Path
+from urllib.parse import urlsplit, urlunsplit
 
 import pytest
+import pytest_asyncio
 import requests
 
 # Add tests directory to path for test_constants import
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from test_constants import TEST_TOKEN  # noqa: E402
 
+from .ws_client import DispatchingWebSocket, connect_authenticated  # noqa: E402
+
 logger = logging.getLogger(__name__)
 
 
@@ -122,6 +129,60 @@ def pytest_collection_modifyitems(config, items):
             item.add_marker(skip_live_only)
 
 
+def _uvloop():
+    """Return the uvloop module, or None if uvloop can't be used.
+
+    uvloop isn't available on Windows, and is an optional dependency elsewhere.
+    """
+    if sys.platform == "win32":
+        return None
+    try:
+        import uvloop
+    except ImportError:
+        return None
+    return uvloop
+
+
+def pytest_report_header(config):
+    """Show which event loop the async e2e tests run on."""
+    loop = "uvloop" if _uvloop() is not None else "asyncio (install uvloop to speed up)"
+    return f"e2e event loop: {loop}"
+
+
+# pytest-asyncio 1.4 deprecates overriding the event_loop_policy fixture in
+# favour of the pytest_asyncio_loop_factories hook, which older versions lack
+_HAS_LOOP_FACTORIES_HOOK = hasattr(
+    getattr(pytest_asyncio.plugin, "PytestAsyncioSpecs", None), "pytest_asyncio_loop_factories"
+)
+
+if _HAS_LOOP_FACTORIES_HOOK:
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_asyncio_loop_factories(config, item):
+        """Run async e2e tests on uvloop when it's installed.
+
+        Falls back to the default asyncio event loop when uvloop can't be used.
+        Only one factory is returned, so test IDs aren't parametrized by loop.
+        """
+        uvloop = _uvloop()
+        if uvloop is not None:
+            return {"uvloop": uvloop.new_event_loop}
+        return {"asyncio": asyncio.new_event_loop}
+
+else:
+
+    @pytest.fixture(scope="session")
+    def event_loop_policy():
+        """Run async e2e tests on uvloop when it's installed.
+
+        Falls back to the default asyncio policy when uvloop can't be used.
+        """
+        uvloop = _uvloop()
+        if uvloop is not None:
+            return uvloop.EventLoopPolicy()
+        return asyncio.DefaultEventLoopPolicy()
+
+
 # Live mode configuration
 LIVE_URL_DEFAULT = "http://homeassistant.local:8123"
 
@@ -306,15 +367,114 @@ def ha_token(request):
     return TEST_TOKEN
 
 
-@pytest.fixture
-def ha_api(ha_url, ha_token):
-    """Return a configured requests session for HA API calls."""
+@pytest.fixture(scope="session")
+def ws_available(ha_url):
+    """Skip WebSocket tests if Home Assistant isn't accepting connections.
+
+    The port is probed once per session; pytest caches the skip, so every
+    dependent test is skipped without paying for its own failed connect.
+    """
+    parts = urlsplit(ha_url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        with socket.create_connection((parts.hostname, port), timeout=1):
+            pass
+    except OSError as e:
+        pytest.skip(f"WebSocket not available: {e}")
+
+
+@pytest.fixture(scope="session")
+def ws_url(ha_url):
+    """Return the Home Assistant WebSocket API URL derived from ha_url."""
+    parts = urlsplit(ha_url)
+    scheme = "wss" if parts.scheme == "https" else "ws"
+    return urlunsplit(parts._replace(scheme=scheme)) + "/api/websocket"
+
+
+@pytest_asyncio.fixture(scope="module", loop_scope="session")
+async def authenticated_websocket(ws_available, ws_url, ha_token):
+    """Open one authenticated WebSocket connection shared by a test module.
+
+    The connect and auth handshake happen once per module instead of once per
+    test. Incoming messages are routed by ID, so tests receive with
+    websocket.receive(msg_id). Tests on the shared connection must take
+    their message IDs from ws_message_ids, send subscribe commands with
+    subscription=True and unsubscribe from anything they subscribe to.
+    """
+    websocket = DispatchingWebSocket(await connect_authenticated(ws_url, ha_token))
+
+    try:
+        yield websocket
+    finally:
+        await websocket.close()
+
+
+@pytest.fixture(scope="module")
+def ws_message_ids():
+    """Return the message ID counter for the module's shared WebSocket.
+
+    HA rejects IDs that don't increase on a connection, so IDs carry on
+    from test to test rather than restarting at 1.
+    """
+    return itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def ha_http(ha_token):
+    """Return an authenticated requests session shared by the whole test run.
+
+    Reusing one session keeps connections to HA alive between tests instead of
+    opening a new TCP connection for every API call.
+    """
     session = requests.Session()
     session.headers["Authorization"] = f"Bearer {ha_token}"
     session.headers["Content-Type"] = "application/json"
+    yield session
+    session.close()
+
+
+@pytest.fixture(scope="session")
+def ha_api(ha_url, ha_http):
+    """Return a helper for HA API calls over the shared session."""
 
     def api_call(method: str, endpoint: str, **kwargs):
         url = f"{ha_url}{endpoint}"
-        return session.request(method, url, timeout=30, **kwargs)
+        return ha_http.request(method, url, timeout=30, **kwargs)
 
     return api_call
+
+
+@pytest.fixture(scope="session")
+def ha_api_cached(ha_url, ha_http):
+    """Return a GET helper whose responses are cached for the whole session.
+
+    Only use this for read-only endpoints whose answer doesn't change while the
+    tests run (e.g. /api/config, /api/services). Anything that mutates state or
+    depends on recorder data should keep using ha_api. Only successful
+    responses are cached, so a transient error is retried on the next call
+    instead of failing every later test.
+    """
+    cache = {}
+
+    def cached_get(endpoint: str):
+        resp = cache.get(endpoint)
+        if resp is None:
+            resp = ha_http.get(f"{ha_url}{endpoint}", timeout=30)
+            if resp.status_code == 200:
+                cache[endpoint] = resp
+        return resp
+
+    return cached_get
+
+
+@pytest.fixture(scope="session")
+def ha_components(ha_api_cached):
+    """Return the set of components loaded in Home Assistant.
+
+    Fetched once per session from /api/config. Skips dependent tests if the
+    config can't be read.
+    """
+    resp = ha_api_cached("/api/config")
+    if resp.status_code != 200:
+        pytest.skip("Cannot get config")
+    return frozenset(resp.json().get("components", []))
@@ -13,9 +13,9 @@ pytestmark = [pytest.mark.e2e]
 class TestAnalyzerPatternDetection:
     """Test that the analyzer detects patterns in historical data."""
 
-    def test_integration_loads(self, ha_api):
+    def test_integration_loads(self, ha_api_cached):
         """Verify our integration loads in real HA."""
-        resp = ha_api("GET", "/api/config")
+        resp = ha_api_cached("/api/config")
         assert resp.status_code == 200
         config = resp.json()
 
@@ -25,9 +25,9 @@ class TestAnalyzerPatternDetection:
             "automation_suggestions" in components
         ), f"automation_suggestions not in components: {components}"
 
-    def test_services_available(self, ha_api):
+    def test_services_available(self, ha_api_cached):
         """Verify our services are registered."""
-        resp = ha_api("GET", "/api/services")
+        resp = ha_api_cached("/api/services")
         assert resp.status_code == 200
         services = resp.json()
 
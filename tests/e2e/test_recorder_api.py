@@ -6,7 +6,6 @@ More comprehensive tests are in test_analyzer.py.
 """
 
 import pytest
-import requests
 
 pytestmark = [pytest.mark.e2e]
 
@@ -14,15 +13,16 @@ pytestmark = [pytest.mark.e2e]
 class TestHomeAssistantConnection:
     """Test basic HA connection."""
 
-    def test_ha_api_accessible(self, ha_url):
+    def test_ha_api_accessible(self, ha_url, ha_http):
         """Verify Home Assistant API is accessible without auth."""
-        resp = requests.get(f"{ha_url}/api/", timeout=10)
+        # Setting the header to None drops the session's token for this request
+        resp = ha_http.get(f"{ha_url}/api/", headers={"Authorization": None}, timeout=10)
         # 401 without auth means API is running
         assert resp.status_code in (200, 401)
 
-    def test_ha_api_with_auth(self, ha_api):
+    def test_ha_api_with_auth(self, ha_api_cached):
         """Verify Home Assistant API works with auth token."""
-        resp = ha_api("GET", "/api/")
+        resp = ha_api_cached("/api/")
         assert resp.status_code == 200
         data = resp.json()
         assert "message" in data
@@ -0,0 +1,275 @@
+"""
+WebSocket helpers shared by the e2e tests.
+
+Keeps the Home Assistant auth handshake in one place so fixtures and tests
+that need an authenticated connection don't each re-implement it. Messages
+are encoded with orjson when it's installed, falling back to the stdlib json
+module otherwise.
+"""
+
+import asyncio
+import functools
+import json
+import re
+
+import pytest
+import websockets
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+if orjson is not None:
+
+    def dumps(obj) -> bytes:
+        """Serialize a WebSocket command to UTF-8 encoded JSON."""
+        return orjson.dumps(obj)
+
+    loads = orjson.loads
+else:
+
+    def dumps(obj) -> bytes:
+        """Serialize a WebSocket command to UTF-8 encoded JSON."""
+        return json.dumps(obj).encode()
+
+    loads = json.loads
+
+# HA sends auth_required as soon as it accepts the connection, so a banner
+# that takes longer than this means HA is broken rather than slow
+BANNER_TIMEOUT = 1.0
+
+# HA sends a subscription's initial event straight after the result, so an
+# event that hasn't arrived within this many seconds isn't coming
+OPTIONAL_EVENT_TIMEOUT = 3.0
+
+# HA serializes the message ID as the first key of every reply and event
+_ID_PREFIX = re.compile(rb'\{\s*"id"\s*:\s*(\d+)')
+
+# Queued by the reader task when it stops, so waiting callers wake up
+_STOPPED = object()
+
+
+async def send_json(websocket, obj) -> None:
+    """Send a command to Home Assistant as a JSON text frame.
+
+    The payload is handed to websockets already encoded, so it isn't encoded
+    a second time. It still goes out as a text frame because HA doesn't accept
+    JSON commands in binary frames.
+
+    Args:
+        websocket: Open WebSocket connection
+        obj: Command to send
+    """
+    await websocket.send(dumps(obj), text=True)
+
+
+async def recv_json(websocket, timeout: float = 10):
+    """Receive the next message from the WebSocket and decode it as JSON.
+
+    Uses asyncio.timeout rather than asyncio.wait_for, which would wrap every
+    recv in its own task. The frame is handed to the JSON decoder as raw bytes;
+    decoding it to str first would validate the UTF-8 a second time.
+
+    Args:
+        websocket: Open WebSocket connection
+        timeout: Seconds to wait for the message
+
+    Returns:
+        The decoded message.
+
+    Raises:
+        TimeoutError: If no message arrives within the timeout.
+    """
+    async with asyncio.timeout(timeout):
+        message = await websocket.recv(decode=False)
+    return loads(message)
+
+
+def connect(ws_url: str):
+    """Open a WebSocket to Home Assistant without authenticating.
+
+    Compression and keepalive pings only add CPU work and wake-ups for the
+    small JSON frames exchanged with a local HA during short test runs, and
+    teardown shouldn't sit out the default 10s closing handshake. The frame
+    size limit leaves room for a long stale_automations list.
+
+    Args:
+        ws_url: Home Assistant WebSocket URL (ws://host:port/api/websocket)
+
+    Returns:
+        The pending connection; await it or use it with ``async with``.
+    """
+    return websockets.connect(
+        ws_url, compression=None, max_size=1 << 22, ping_interval=None, close_timeout=1
+    )
+
+
+@functools.cache
+def _auth_frame(token: str) -> bytes:
+    """Return the serialized auth message for a token, built once per token."""
+    return dumps({"type": "auth", "access_token": token})
+
+
+async def connect_authenticated(ws_url: str, token: str):
+    """Open a WebSocket to Home Assistant and complete the auth handshake.
+
+    Args:
+        ws_url: Home Assistant WebSocket URL (ws://host:port/api/websocket)
+        token: Long-lived access token
+
+    Returns:
+        The open, authenticated connection. Callers are responsible for closing it.
+    """
+    websocket = await connect(ws_url)
+
+    try:
+        # Send auth without waiting for auth_required first. HA only reads the
+        # socket after sending its banner, so the early message just waits in
+        # the buffer and the handshake saves a round trip
+        await websocket.send(_auth_frame(token), text=True)
+
+        # Wait for auth_required
+        data = await recv_json(websocket)
+        if data["type"] != "auth_required":
+            pytest.fail(f"Expected auth_required, got: {data['type']}")
+
+        # Wait for auth_ok
+        data = await recv_json(websocket)
+        if data["type"] != "auth_ok":
+            pytest.fail(f"Expected auth_ok, got: {data}")
+    except BaseException:
+        await websocket.close()
+        raise
+
+    return websocket
+
+
+class DispatchingWebSocket:
+    """Authenticated connection that routes incoming messages by message ID.
+
+    A single reader task receives every message and queues it under its ID, so
+    each caller only wakes up for replies and events addressed to it. The ID is
+    read from the raw frame first; frames without an ID, or for IDs nobody sent
+    or is still subscribed to, are dropped without being queued. A command's
+    queue is dropped once its result has been received, unless the command
+    started a subscription.
+    """
+
+    def __init__(self, websocket):
+        """Start dispatching messages from an authenticated connection."""
+        self._websocket = websocket
+        self._queues: dict[int, asyncio.Queue] = {}
+        self._subscriptions: set[int] = set()
+        self._reader = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        """Queue incoming messages under their ID until the connection closes."""
+        try:
+            while True:
+                raw = await self._websocket.recv(decode=False)
+                match = _ID_PREFIX.match(raw)
+                if match is None:
+                    data = loads(raw)
+                    queue = self._queues.get(data.get("id"))
+                    if queue is not None:
+                        queue.put_nowait(data)
+                    continue
+                queue = self._queues.get(int(match.group(1)))
+                if queue is not None:
+                    queue.put_nowait(loads(raw))
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            # Wake everyone still waiting, so they fail fast instead of timing out
+            for queue in self._queues.values():
+                queue.put_nowait(_STOPPED)
+
+    def _queue(self, msg_id: int) -> asyncio.Queue:
+        """Return the queue for a message ID, creating it if needed."""
+        queue = self._queues.get(msg_id)
+        if queue is None:
+            queue = self._queues[msg_id] = asyncio.Queue()
+        return queue
+
+    async def send_json(self, obj, subscription: bool = False) -> None:
+        """Send a command to Home Assistant as a JSON text frame.
+
+        The command's ID is registered before sending, so its reply is queued
+        even if it arrives before anyone calls receive.
+
+        Args:
+            obj: Command to send
+            subscription: Whether the command keeps sending events after its
+                result, so its queue must outlive the result
+        """
+        self._queue(obj["id"])
+        if subscription:
+            self._subscriptions.add(obj["id"])
+        await send_json(self._websocket, obj)
+
+    async def receive(self, msg_id: int, timeout: float = 10):
+        """Return the next message for a command or subscription.
+
+        Args:
+            msg_id: ID of the command or subscription
+            timeout: Seconds to wait for the message
+
+        Raises:
+            TimeoutError: If no message arrives within the timeout.
+            ConnectionError: If the connection closed before the message arrived.
+            Exception: Whatever stopped the reader task, e.g. a malformed frame.
+        """
+        queue = self._queue(msg_id)
+        if queue.empty() and self._reader.done():
+            data = _STOPPED
+        else:
+            async with asyncio.timeout(timeout):
+                data = await queue.get()
+
+        if data is _STOPPED:
+            # Leave the marker for any later receive on the same ID
+            queue.put_nowait(_STOPPED)
+            self._reader.result()
+            raise ConnectionError("WebSocket connection closed")
+
+        if data.get("type") == "result" and (
+            msg_id not in self._subscriptions or not data.get("success")
+        ):
+            self._queues.pop(msg_id, None)
+            self._subscriptions.discard(msg_id)
+        return data
+
+    async def unsubscribe(self, msg_id: int, subscription: int, timeout: float = 10) -> None:
+        """Cancel a subscription and wait for Home Assistant to acknowledge it.
+
+        Events still queued for the subscription are dropped, so nothing is
+        left behind on the shared connection for the next test.
+
+        Args:
+            msg_id: Message ID for the unsubscribe_events command
+            subscription: Message ID the subscription was created with
+            timeout: Seconds to wait for the acknowledgment
+        """
+        cmd = {"id": msg_id, "type": "unsubscribe_events", "subscription": subscription}
+        await self.send_json(cmd)
+        data = await self.receive(msg_id, timeout=timeout)
+        self._queues.pop(subscription, None)
+        self._subscriptions.discard(subscription)
+
+        assert data["success"] is True, f"Unsubscribe failed: {data}"
+
+    async def close(self) -> None:
+        """Close the connection and stop the reader task.
+
+        This only runs at test teardown, where a clean closing handshake
+        doesn't matter. If HA doesn't complete it promptly, the connection
+        is dropped instead and HA cleans up its side on its own.
+        """
+        try:
+            async with asyncio.timeout(0.5):
+                await self._websocket.close()
+        except TimeoutError:
+            self._websocket.transport.abort()
+        await self._reader
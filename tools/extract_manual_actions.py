@@ -7,14 +7,52 @@ based on patterns in timing and frequency.
 """
 
 import argparse
+import calendar
+import functools
+import itertools
 import json
+import operator
 import os
 import sys
-from collections import defaultdict
-from datetime import datetime, timedelta
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+
+try:
+    import ciso8601
+except ImportError:
+    ciso8601 = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Domains whose manual actions are analyzed, in display order
+DOMAINS = ("light", "switch", "scene", "cover", "climate", "script")
+_DOMAIN_SET = frozenset(DOMAINS)
+
+# Context domains whose actions were started by HA rather than a user. A tuple
+# rather than a frozenset so malformed, unhashable values don't raise
+_AUTOMATION_DOMAINS = ("automation", "script")
+
+# Number of days of logbook fetched concurrently
+LOGBOOK_WORKERS = 8
+
+# Seconds to wait for the entity list before fetching the full logbook instead
+STATES_TIMEOUT = 10
+
+# Shared session so concurrent logbook requests reuse pooled connections.
+# Transient failures are retried with backoff rather than failing the whole run
+_RETRY = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504))
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_maxsize=LOGBOOK_WORKERS, max_retries=_RETRY))
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=LOGBOOK_WORKERS, max_retries=_RETRY))
 
 
 def get_ha_token():
@@ -43,13 +81,65 @@ def get_ha_base_url():
     return "http://192.168.1.217:8123"
 
 
-def get_logbook_entries(base_url, token, start_time, end_time, entity_id=None):
-    """Query the Home Assistant logbook API."""
-    headers = {
+def _decode_json(response):
+    """Decode a JSON response body, with orjson when it's installed."""
+    if orjson is not None:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+def _api_headers(token):
+    """Build the headers for a Home Assistant REST API request."""
+    return {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
     }
 
+
+def get_entity_filters(base_url, token, domains=DOMAINS, max_length=2000):
+    """Build logbook entity filters covering every current entity in the given domains.
+
+    Each filter is a comma-separated list of entity IDs from a single domain,
+    split so that no filter is longer than max_length characters and the
+    request URL stays well within Home Assistant's limits.
+
+    Only entities that exist now are listed, so history for entities removed
+    or renamed since is not covered. The lookup bypasses the shared session's
+    retries and gives up after STATES_TIMEOUT seconds, so callers can fall
+    back to the unfiltered logbook quickly.
+    """
+    response = requests.get(
+        f"{base_url}/api/states", headers=_api_headers(token), timeout=STATES_TIMEOUT
+    )
+    response.raise_for_status()
+
+    entity_ids_by_domain = {domain: [] for domain in domains}
+    for state in _decode_json(response):
+        entity_id = str(state.get("entity_id") or "")
+        entity_ids = entity_ids_by_domain.get(entity_domain(entity_id))
+        if entity_ids is not None:
+            entity_ids.append(entity_id)
+
+    filters = []
+    for entity_ids in entity_ids_by_domain.values():
+        chunk = []
+        length = 0
+        for entity_id in entity_ids:
+            if chunk and length + 1 + len(entity_id) > max_length:
+                filters.append(",".join(chunk))
+                chunk = []
+                length = 0
+            length += len(entity_id) + (1 if chunk else 0)
+            chunk.append(entity_id)
+        if chunk:
+            filters.append(",".join(chunk))
+    return filters
+
+
+def get_logbook_entries(base_url, token, start_time, end_time, entity_id=None):
+    """Query the Home Assistant logbook API."""
+    headers = _api_headers(token)
+
     # Format timestamps for API
     start_str = start_time.isoformat()
     end_str = end_time.isoformat()
@@ -60,10 +150,61 @@ def get_logbook_entries(base_url, token, start_time, end_time, entity_id=None):
     if entity_id:
         params["entity"] = entity_id
 
-    response = requests.get(url, headers=headers, params=params, timeout=60)
+    response = _SESSION.get(url, headers=headers, params=params, timeout=60)
     response.raise_for_status()
 
-    return response.json()
+    return _decode_json(response)
+
+
+def split_by_day(start_time, end_time):
+    """Split a time range into consecutive ranges of at most one day."""
+    ranges = []
+    day_start = start_time
+    while day_start < end_time:
+        day_end = min(day_start + timedelta(days=1), end_time)
+        ranges.append((day_start, day_end))
+        day_start = day_end
+    return ranges
+
+
+def iter_logbook_entries_by_day(
+    base_url, token, start_time, end_time, entity_filters=None, workers=LOGBOOK_WORKERS
+):
+    """Query the logbook one day at a time, fetching the days concurrently.
+
+    Smaller responses are quicker for Home Assistant to build and serialize, and
+    the requests overlap instead of waiting on one large response. Entries are
+    yielded one day's response at a time, in day order. At most `workers`
+    requests are in flight at once, and the next is only sent as a response is
+    handed over, so no more than workers + 1 responses are held in memory
+    however long the period is.
+
+    If entity_filters is given, each day is queried once per filter (see
+    get_entity_filters), so Home Assistant only sends entries for those entities.
+    """
+    queries = iter(
+        [
+            (day_start, day_end, entity_filter)
+            for day_start, day_end in split_by_day(start_time, end_time)
+            for entity_filter in (entity_filters if entity_filters is not None else [None])
+        ]
+    )
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = deque(
+            executor.submit(get_logbook_entries, base_url, token, *query)
+            for query in itertools.islice(queries, workers)
+        )
+        try:
+            while pending:
+                entries = pending.popleft().result()
+                query = next(queries, None)
+                if query is not None:
+                    pending.append(executor.submit(get_logbook_entries, base_url, token, *query))
+                yield from entries
+        finally:
+            # Don't fetch days nobody will read if the caller stops early
+            for future in pending:
+                future.cancel()
 
 
 def is_manual_action(entry):
@@ -77,68 +218,131 @@ def is_manual_action(entry):
         return False
 
     # Exclude internal/system events
-    context_domain = entry.get("context_domain", "")
-    if context_domain in ("automation", "script"):
-        return False
+    return entry.get("context_domain") not in _AUTOMATION_DOMAINS
+
+
+def entity_domain(entity_id):
+    """Return the domain part of an entity ID, or "" if it has none."""
+    dot = entity_id.find(".")
+    return entity_id[:dot] if dot >= 0 else ""
 
-    return True
 
+def extract_action_from_entry(entry, domain=None):
+    """Extract the action type from a logbook entry.
 
-def extract_action_from_entry(entry):
-    """Extract the action type from a logbook entry."""
+    Callers that have already worked out the entry's domain can pass it in to
+    avoid splitting the entity ID again.
+    """
     state = entry.get("state", "")
 
     # Handle different entity types
-    entity_id = str(entry.get("entity_id") or "")
-    domain = entity_id.split(".")[0] if "." in entity_id else ""
-
-    if domain == "scene":
-        return "activated"
-    elif domain == "script":
-        return "executed" if state == "on" else state
-    elif domain in ("light", "switch", "cover"):
-        if state == "on":
-            return "turn_on"
-        elif state == "off":
-            return "turn_off"
-        else:
-            return state
-    elif domain == "climate":
-        return f"set_{state}" if state else "changed"
-    else:
+    if domain is None:
+        domain = entity_domain(str(entry.get("entity_id") or ""))
+
+    handler = _ACTION_HANDLERS.get(domain)
+    if handler is None:
         return state or "unknown"
+    return handler(state)
+
+
+def _on_off_action(state):
+    """Map an on/off state to the service that caused it."""
+    if state == "on":
+        return "turn_on"
+    if state == "off":
+        return "turn_off"
+    return state
+
+
+# How each domain's new state maps to the action the user took
+_ACTION_HANDLERS = {
+    "scene": lambda state: "activated",
+    "script": lambda state: "executed" if state == "on" else state,
+    "light": _on_off_action,
+    "switch": _on_off_action,
+    "cover": _on_off_action,
+    "climate": lambda state: f"set_{state}" if state else "changed",
+}
 
 
 def parse_timestamp(ts_str):
-    """Parse ISO timestamp from Home Assistant."""
+    """Parse ISO or Unix epoch timestamp from Home Assistant."""
     if not ts_str:
         return None
 
-    # Handle non-string inputs (e.g., integer timestamps)
+    # Some Home Assistant versions send epoch seconds rather than ISO strings
+    if isinstance(ts_str, (int, float)) and not isinstance(ts_str, bool):
+        try:
+            return datetime.fromtimestamp(ts_str, tz=UTC)
+        except (OverflowError, OSError, ValueError):
+            return None
+
+    # Handle other non-string inputs
     if not isinstance(ts_str, str):
         return None
 
-    # Handle various timestamp formats
-    ts_str = ts_str.replace("Z", "+00:00")
-
+    return _parse_iso_timestamp(ts_str)
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_iso_timestamp(ts_str):
+    """Parse an ISO timestamp string, caching results for repeated values.
+
+    Logbook entries for the same burst of state changes often share the same
+    timestamp string. datetime objects are immutable, so the cached instance
+    can be handed out to every caller. Uses ciso8601 when it's installed, which
+    parses several times faster and accepts the "Z" suffix as-is. ciso8601 also
+    accepts reduced precision dates such as "2024-01", so only strings longer
+    than a bare date take that path. Strings ciso8601 rejects, such as ISO week
+    dates, are retried with the stdlib parser.
+    """
+    if ciso8601 is not None and len(ts_str) > 10:
+        try:
+            return ciso8601.parse_datetime(ts_str)
+        except ValueError:
+            pass
     try:
-        # Try parsing with timezone
-        if "+" in ts_str or ts_str.endswith("Z"):
-            return datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
-        else:
-            return datetime.fromisoformat(ts_str)
+        return datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
     except ValueError:
         return None
 
 
+def timestamp_seconds(ts_str):
+    """Parse a Home Assistant timestamp into wall-clock seconds since 1970-01-01.
+
+    The UTC offset is dropped rather than applied, so the hour and minute of the
+    result match those written in the timestamp. An int is far smaller than a
+    datetime to keep around for every action.
+    """
+    ts = parse_timestamp(ts_str)
+    if ts is None:
+        return None
+    return calendar.timegm(ts.timetuple())
+
+
 def get_hour_bucket(dt):
     """Get the hour bucket (0-23) for a datetime."""
     return dt.hour
 
 
+# "HH:MM" label for each 30-minute window of the day, indexed by hour * 2 + minute // 30
+_WINDOW_STRS = tuple(f"{hour:02d}:{minute:02d}" for hour in range(24) for minute in (0, 30))
+
+# Time range labels indexed by [first hour][last hour]; the diagonal is a single hour
+_RANGE_STRS = tuple(
+    tuple(
+        f"{first:02d}:00" if first == last else f"{first:02d}:00-{last:02d}:59"
+        for last in range(24)
+    )
+    for first in range(24)
+)
+
+
 def get_time_window(dt, window_minutes=30):
     """Get a time window string for grouping."""
     hour = dt.hour
+    if window_minutes == 30:
+        return _WINDOW_STRS[hour * 2 + dt.minute // 30]
     minute_bucket = (dt.minute // window_minutes) * window_minutes
     return f"{hour:02d}:{minute_bucket:02d}"
 
@@ -151,14 +355,34 @@ def format_time_range(hours):
     min_hour = min(hours)
     max_hour = max(hours)
 
+    if 0 <= min_hour and max_hour < 24:
+        return _RANGE_STRS[min_hour][max_hour]
     if min_hour == max_hour:
         return f"{min_hour:02d}:00"
     else:
         return f"{min_hour:02d}:00-{max_hour:02d}:59"
 
 
+def group_actions_by_entity(timestamps_by_action):
+    """Nest timestamps keyed by (entity_id, action) under each entity.
+
+    Entities and their actions keep the order they were first seen in.
+    """
+    actions_by_entity = {}
+    for (entity_id, action), timestamps in timestamps_by_action.items():
+        actions = actions_by_entity.get(entity_id)
+        if actions is None:
+            actions = actions_by_entity[entity_id] = {}
+        actions[action] = timestamps
+    return actions_by_entity
+
+
 def analyze_patterns(actions_by_entity):
-    """Analyze timing patterns in actions."""
+    """Analyze timing patterns in actions.
+
+    Timestamps are wall-clock seconds as returned by timestamp_seconds, or None
+    for actions whose time couldn't be parsed.
+    """
     patterns = {}
 
     for entity_id, actions in actions_by_entity.items():
@@ -168,20 +392,21 @@ def analyze_patterns(actions_by_entity):
             if len(timestamps) < 2:
                 continue
 
-            # Group by time window
-            time_windows = defaultdict(list)
-            hours = []
+            # Bucket each action into its 30-minute window of the day; the hour is
+            # the window halved, so each timestamp is only divided down once
+            windows = [ts // 1800 % 48 for ts in timestamps if ts is not None]
+            hours = [window >> 1 for window in windows]
 
-            for ts in timestamps:
-                if ts:
-                    window = get_time_window(ts)
-                    time_windows[window].append(ts)
-                    hours.append(ts.hour)
+            # Count actions in a slot per window
+            window_counts = [0] * 48
+            for window in windows:
+                window_counts[window] += 1
 
             # Find the most common time window
-            if time_windows:
-                most_common_window = max(time_windows.keys(), key=lambda w: len(time_windows[w]))
-                window_count = len(time_windows[most_common_window])
+            if hours:
+                window_count = max(window_counts)
+                window = window_counts.index(window_count)
+                most_common_window = _WINDOW_STRS[window]
 
                 entity_patterns[action_type] = {
                     "total_count": len(timestamps),
@@ -224,28 +449,32 @@ def find_automation_candidates(patterns, min_occurrences=3):
                 )
 
     # Sort by consistency and frequency
-    candidates.sort(key=lambda c: (c["consistency"], c["total_occurrences"]), reverse=True)
+    candidates.sort(key=operator.itemgetter("consistency", "total_occurrences"), reverse=True)
 
     return candidates
 
 
-def print_summary(actions_by_entity, patterns, days):
-    """Print the manual actions summary."""
+def print_summary(actions_by_entity, patterns, days, entity_totals=None):
+    """Print the manual actions summary.
+
+    entity_totals maps each entity to its number of actions. Pass the totals
+    counted while collecting the actions to avoid recounting them here.
+    """
     print(f"\n=== Manual Actions Summary (Last {days} Days) ===\n")
 
     if not actions_by_entity:
         print("No manual actions found for the specified period.")
         return
 
-    # Sort entities by total action count
-    entity_totals = []
-    for entity_id, actions in actions_by_entity.items():
-        total = sum(len(ts_list) for ts_list in actions.values())
-        entity_totals.append((entity_id, total, actions))
-
-    entity_totals.sort(key=lambda x: x[1], reverse=True)
+    if entity_totals is None:
+        entity_totals = {
+            entity_id: sum(len(ts_list) for ts_list in actions.values())
+            for entity_id, actions in actions_by_entity.items()
+        }
 
-    for entity_id, total, actions in entity_totals:
+    # Sort entities by total action count
+    for entity_id, total in sorted(entity_totals.items(), key=lambda x: x[1], reverse=True):
+        actions = actions_by_entity[entity_id]
         print(f"Entity: {entity_id}")
         print(f"  Actions: {total} total")
 
@@ -292,7 +521,7 @@ def print_automation_candidates(candidates):
         print()
 
 
-def main():
+def main(argv=None):
     parser = argparse.ArgumentParser(
         description="Extract manual user actions from Home Assistant logbook"
     )
@@ -311,8 +540,14 @@ def main():
         help="Minimum occurrences to suggest automation (default: 3)",
     )
     parser.add_argument("--json", action="store_true", help="Output in JSON format")
+    parser.add_argument(
+        "--filter-by-current-entities",
+        action="store_true",
+        help="Only fetch logbook entries for entities that exist now (faster on large "
+        "logbooks, but misses removed or renamed entities)",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Get token
     try:
@@ -321,34 +556,46 @@ def main():
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
-    # Define domains to query
-    domains = ["light", "switch", "scene", "cover", "climate", "script"]
-
     # Calculate time range
     end_time = datetime.now()
     start_time = end_time - timedelta(days=args.days)
 
     print(f"Querying Home Assistant at {args.base_url}")
     print(f"Time range: {start_time.strftime('%Y-%m-%d')} to {end_time.strftime('%Y-%m-%d')}")
-    print(f"Domains: {', '.join(domains)}")
+    print(f"Domains: {', '.join(DOMAINS)}")
     print("Fetching logbook entries...")
 
-    # Collect all manual actions
-    actions_by_entity = defaultdict(lambda: defaultdict(list))
+    # Collect all manual actions, keyed by (entity_id, action)
+    timestamps_by_action = {}
+    entity_totals = {}
     total_entries = 0
     manual_entries = 0
 
     try:
-        # Query logbook
-        entries = get_logbook_entries(args.base_url, token, start_time, end_time)
-        total_entries = len(entries)
+        # Optionally ask HA for just the current entities in our domains. If
+        # the lookup fails, everything is fetched and filtered here instead
+        entity_filters = None
+        if args.filter_by_current_entities:
+            try:
+                entity_filters = get_entity_filters(args.base_url, token)
+            except requests.exceptions.RequestException as e:
+                print(
+                    f"Warning: Could not list entities ({e}), fetching all logbook entries",
+                    file=sys.stderr,
+                )
+
+        # Query logbook, filtering each day's entries as they arrive
+        entries = iter_logbook_entries_by_day(
+            args.base_url, token, start_time, end_time, entity_filters
+        )
 
         for entry in entries:
+            total_entries += 1
             entity_id = str(entry.get("entity_id") or "")
 
             # Check if entity is in our target domains
-            domain = entity_id.split(".")[0] if "." in entity_id else ""
-            if domain not in domains:
+            domain = entity_domain(entity_id)
+            if domain not in _DOMAIN_SET:
                 continue
 
             # Check if it's a manual action
@@ -356,12 +603,20 @@ def main():
                 continue
 
             manual_entries += 1
+            entity_totals[entity_id] = entity_totals.get(entity_id, 0) + 1
 
             # Extract action and timestamp
-            action = extract_action_from_entry(entry)
-            timestamp = parse_timestamp(entry.get("when"))
+            action = extract_action_from_entry(entry, domain)
+            timestamp = timestamp_seconds(entry.get("when"))
+
+            key = (entity_id, action)
+            timestamps = timestamps_by_action.get(key)
+            if timestamps is None:
+                timestamps_by_action[key] = [timestamp]
+            else:
+                timestamps.append(timestamp)
 
-            actions_by_entity[entity_id][action].append(timestamp)
+        actions_by_entity = group_actions_by_entity(timestamps_by_action)
 
         print(f"Found {total_entries} total logbook entries")
         print(
@@ -400,9 +655,22 @@ def main():
             "patterns": patterns,
             "automation_candidates": candidates,
         }
-        print(json.dumps(output, indent=2, default=str))
+        if orjson is not None:
+            # Written as bytes, so flush the text output printed above first
+            sys.stdout.flush()
+            sys.stdout.buffer.write(
+                orjson.dumps(
+                    output,
+                    default=str,
+                    # Actions can be None, which json.dumps writes as "null"
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                )
+                + b"\n"
+            )
+        else:
+            print(json.dumps(output, indent=2, default=str))
     else:
-        print_summary(actions_by_entity, patterns, args.days)
+        print_summary(actions_by_entity, patterns, args.days, entity_totals)
         print_automation_candidates(candidates)
 
     return 0
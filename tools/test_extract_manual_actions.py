@@ -12,22 +12,38 @@ Covers:
 7. find_automation_candidates function
 """
 
-from datetime import datetime
+import calendar
+import json
+import threading
+from datetime import UTC, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock, patch
 
 import pytest
+import requests
 
 # Import the module under test
 from extract_manual_actions import (
+    STATES_TIMEOUT,
+    _parse_iso_timestamp,
+    analyze_patterns,
+    entity_domain,
     extract_action_from_entry,
     find_automation_candidates,
     format_time_range,
+    get_entity_filters,
     get_ha_base_url,
     get_ha_token,
     get_logbook_entries,
     get_time_window,
+    group_actions_by_entity,
     is_manual_action,
+    iter_logbook_entries_by_day,
+    main,
     parse_timestamp,
+    print_summary,
+    split_by_day,
+    timestamp_seconds,
 )
 
 # =============================================================================
@@ -183,6 +199,16 @@ class TestIsManualAction:
         }
         assert is_manual_action(entry) is True
 
+    def test_returns_true_with_unhashable_context_domain(self):
+        """Should not raise when context_domain is a malformed, unhashable value."""
+        entry = {
+            "entity_id": "light.living_room",
+            "state": "on",
+            "context_user_id": "user123",
+            "context_domain": {"name": "automation"},
+        }
+        assert is_manual_action(entry) is True
+
     def test_returns_true_with_other_event_type(self):
         """Should return True when context_event_type is not automation_triggered."""
         entry = {
@@ -329,6 +355,34 @@ class TestExtractActionFromEntry:
         }
         assert extract_action_from_entry(entry) == "unknown"
 
+    def test_uses_precomputed_domain(self):
+        """A domain passed in should be used instead of splitting the entity ID."""
+        entry = {
+            "entity_id": "light.kitchen",
+            "state": "on",
+        }
+        assert extract_action_from_entry(entry, "scene") == "activated"
+
+
+class TestEntityDomain:
+    """Tests for the entity_domain function."""
+
+    def test_returns_domain_before_first_dot(self):
+        """Should return everything before the first dot."""
+        assert entity_domain("light.living_room") == "light"
+
+    def test_multiple_dots_splits_on_first(self):
+        """Should split on the first dot only."""
+        assert entity_domain("light.living.room") == "light"
+
+    def test_returns_empty_string_without_dot(self):
+        """Should return an empty string when there is no dot."""
+        assert entity_domain("light_living_room") == ""
+
+    def test_returns_empty_string_for_leading_dot(self):
+        """Should return an empty string when the entity ID starts with a dot."""
+        assert entity_domain(".living_room") == ""
+
 
 # =============================================================================
 # 4. parse_timestamp Function Tests
@@ -415,6 +469,117 @@ class TestParseTimestamp:
         assert result.minute == 0
         assert result.second == 0
 
+    def test_parses_float_epoch_timestamp(self):
+        """Should parse float epoch seconds as an aware UTC datetime."""
+        result = parse_timestamp(1705750800.5)
+        assert result == datetime(2024, 1, 20, 11, 40, 0, 500000, tzinfo=UTC)
+
+    def test_returns_none_for_boolean_input(self):
+        """Should not treat a boolean as an epoch timestamp."""
+        assert parse_timestamp(True) is None
+
+    def test_returns_none_for_out_of_range_epoch(self):
+        """Should return None for an epoch too large to represent."""
+        assert parse_timestamp(1e20) is None
+
+    def test_repeated_timestamp_returns_cached_result(self):
+        """Should reuse the parsed datetime for a timestamp seen before."""
+        first = parse_timestamp("2025-01-20T14:30:00Z")
+        second = parse_timestamp("2025-01-20T14:30:00Z")
+        assert first is second
+
+    def test_returns_none_for_unhashable_input(self):
+        """Should return None for non-string input without hitting the cache."""
+        assert parse_timestamp({"when": "2025-01-20T14:30:00Z"}) is None
+
+
+class TestParseTimestampWithCiso8601:
+    """Tests for the ciso8601 fast path of timestamp parsing."""
+
+    ISO_TIMESTAMPS = [
+        "2025-01-20",
+        "2025-01-20T14:30:00",
+        "2025-01-20T14:30:00Z",
+        "2025-01-20T14:30:00.123456Z",
+        "2025-01-20T14:30:00+00:00",
+        "2025-01-20T14:30:00-05:00",
+        "2025-W04-1T14:30:00Z",
+    ]
+
+    @pytest.fixture(autouse=True)
+    def clear_parse_cache(self):
+        """Don't let results parsed by another path leak in through the cache."""
+        _parse_iso_timestamp.cache_clear()
+        yield
+        _parse_iso_timestamp.cache_clear()
+
+    @pytest.fixture
+    def stub_ciso8601(self):
+        """Replace ciso8601 with a stub that records what it's asked to parse."""
+        stub = MagicMock()
+        stub.parse_datetime.side_effect = lambda ts: datetime.fromisoformat(
+            ts.replace("Z", "+00:00")
+        )
+        with patch("extract_manual_actions.ciso8601", stub):
+            yield stub
+
+    def test_passes_full_timestamps_to_ciso8601_unchanged(self, stub_ciso8601):
+        """Should hand timestamps to ciso8601 with their "Z" suffix as-is."""
+        result = parse_timestamp("2025-01-20T14:30:00Z")
+
+        stub_ciso8601.parse_datetime.assert_called_once_with("2025-01-20T14:30:00Z")
+        assert result == datetime(2025, 1, 20, 14, 30, tzinfo=UTC)
+
+    def test_parses_bare_dates_without_ciso8601(self, stub_ciso8601):
+        """Should keep bare and reduced precision dates on the stdlib path."""
+        assert parse_timestamp("2025-01-20") == datetime(2025, 1, 20)
+        assert parse_timestamp("2025-01") is None
+        stub_ciso8601.parse_datetime.assert_not_called()
+
+    def test_falls_back_to_stdlib_when_ciso8601_rejects(self, stub_ciso8601):
+        """Should parse with the stdlib when ciso8601 raises ValueError."""
+        stub_ciso8601.parse_datetime.side_effect = ValueError("invalid")
+
+        assert parse_timestamp("2025-W04-1T14:30:00Z") == datetime(2025, 1, 20, 14, 30, tzinfo=UTC)
+        assert parse_timestamp("2025-01-20T99:99:99") is None
+
+    @pytest.mark.parametrize("ts_str", ISO_TIMESTAMPS)
+    def test_matches_stdlib_parsing(self, ts_str):
+        """Should parse exactly as the stdlib path does when ciso8601 is installed."""
+        ciso8601 = pytest.importorskip("ciso8601")
+
+        with patch("extract_manual_actions.ciso8601", ciso8601):
+            fast = parse_timestamp(ts_str)
+        _parse_iso_timestamp.cache_clear()
+        with patch("extract_manual_actions.ciso8601", None):
+            stdlib = parse_timestamp(ts_str)
+
+        assert fast == stdlib
+        assert fast.utcoffset() == stdlib.utcoffset()
+
+
+class TestTimestampSeconds:
+    """Tests for the timestamp_seconds function."""
+
+    def test_returns_none_for_unparseable_timestamp(self):
+        """Should return None when the timestamp can't be parsed."""
+        assert timestamp_seconds(None) is None
+        assert timestamp_seconds("not-a-timestamp") is None
+
+    def test_returns_seconds_for_utc_timestamp(self):
+        """Should return seconds since 1970-01-01 for a UTC timestamp."""
+        assert timestamp_seconds("1970-01-02T01:30:15Z") == 86400 + 5415
+
+    def test_keeps_wall_clock_time_of_offset_timestamp(self):
+        """Should keep the written hour and minute rather than converting to UTC."""
+        seconds = timestamp_seconds("2025-01-20T14:30:00+05:30")
+        assert seconds // 3600 % 24 == 14
+        assert seconds // 60 % 60 == 30
+
+    def test_naive_and_utc_timestamps_match(self):
+        """Should give the same result with or without a UTC suffix."""
+        assert timestamp_seconds("2025-01-20T14:30:00") == timestamp_seconds("2025-01-20T14:30:00Z")
+
 
 # =============================================================================
 # 5. get_time_window Function Tests
@@ -478,6 +643,13 @@ class TestGetTimeWindow:
         result = get_time_window(dt)
         assert result == "23:30"
 
+    def test_every_minute_of_day_matches_formatted_window(self):
+        """The 30-minute window label should match formatting for every minute of the day."""
+        for hour in range(24):
+            for minute in range(60):
+                dt = datetime(2025, 1, 20, hour, minute)
+                assert get_time_window(dt) == f"{hour:02d}:{minute // 30 * 30:02d}"
+
     def test_custom_window_minutes_15(self):
         """Should work with custom window of 15 minutes."""
         dt = datetime(2025, 1, 20, 14, 37, 0)
@@ -545,6 +717,16 @@ class TestFormatTimeRange:
         result = format_time_range(hours)
         assert result == "10:00"
 
+    def test_every_hour_pair_matches_formatted_range(self):
+        """Every in-day range should match the formatted start and end hours."""
+        for first in range(24):
+            for last in range(first + 1, 24):
+                assert format_time_range([first, last]) == f"{first:02d}:00-{last:02d}:59"
+
+    def test_hours_outside_the_day_are_still_formatted(self):
+        """Hours outside 0-23 should fall back to formatting instead of failing."""
+        assert format_time_range([22, 25]) == "22:00-25:59"
+
 
 # =============================================================================
 # 7. find_automation_candidates Function Tests
@@ -640,6 +822,31 @@ class TestFindAutomationCandidates:
         assert result[1]["entity_id"] == "light.living_room"
         assert result[1]["consistency"] == 0.6
 
+    def test_equal_consistency_sorted_by_occurrences(self):
+        """Should break consistency ties by total occurrences (descending)."""
+        patterns = {
+            "light.porch": {
+                "turn_on": {
+                    "total_count": 3,
+                    "most_common_window": "18:00",
+                    "window_count": 3,
+                    "hours": [18, 18, 18],
+                    "time_range": "18:00",
+                }
+            },
+            "light.bedroom": {
+                "turn_off": {
+                    "total_count": 5,
+                    "most_common_window": "22:00",
+                    "window_count": 5,
+                    "hours": [22, 22, 22, 22, 22],
+                    "time_range": "22:00",
+                }
+            },
+        }
+        result = find_automation_candidates(patterns, min_occurrences=3)
+        assert [c["entity_id"] for c in result] == ["light.bedroom", "light.porch"]
+
     def test_candidates_include_all_required_fields(self):
         """Should include all required fields in candidate objects."""
         patterns = {
@@ -726,6 +933,172 @@ class TestFindAutomationCandidates:
         assert set(actions) == {"turn_on", "turn_off"}
 
 
+# =============================================================================
+# group_actions_by_entity Function Tests
+# =============================================================================
+
+
+class TestGroupActionsByEntity:
+    """Tests for the group_actions_by_entity function."""
+
+    def test_returns_empty_dict_for_no_actions(self):
+        """Should return an empty dict when there are no actions."""
+        assert group_actions_by_entity({}) == {}
+
+    def test_nests_actions_under_their_entity(self):
+        """Should group each entity's actions together, keeping their timestamps."""
+        on_times = [datetime(2025, 1, 20, 7, 5)]
+        off_times = [datetime(2025, 1, 20, 22, 5)]
+        fan_times = [datetime(2025, 1, 20, 13, 0)]
+
+        result = group_actions_by_entity(
+            {
+                ("light.kitchen", "turn_on"): on_times,
+                ("switch.fan", "turn_on"): fan_times,
+                ("light.kitchen", "turn_off"): off_times,
+            }
+        )
+
+        assert result == {
+            "light.kitchen": {"turn_on": on_times, "turn_off": off_times},
+            "switch.fan": {"turn_on": fan_times},
+        }
+
+    def test_keeps_first_seen_order(self):
+        """Should order entities and actions by when they were first seen."""
+        result = group_actions_by_entity(
+            {
+                ("switch.fan", "turn_on"): [None],
+                ("light.kitchen", "turn_off"): [None],
+                ("light.kitchen", "turn_on"): [None],
+            }
+        )
+
+        assert list(result) == ["switch.fan", "light.kitchen"]
+        assert list(result["light.kitchen"]) == ["turn_off", "turn_on"]
+
+
+# =============================================================================
+# analyze_patterns Function Tests
+# =============================================================================
+
+
+def _seconds(*args):
+    """Return wall-clock seconds for a date and time, as timestamp_seconds would."""
+    return calendar.timegm(datetime(*args).timetuple())
+
+
+class TestAnalyzePatterns:
+    """Tests for the analyze_patterns function."""
+
+    def test_skips_actions_with_fewer_than_two_timestamps(self):
+        """Should not report a pattern for an action seen only once."""
+        actions_by_entity = {
+            "light.living_room": {"turn_on": [_seconds(2025, 1, 20, 7, 5)]},
+        }
+        assert analyze_patterns(actions_by_entity) == {}
+
+    def test_finds_most_common_window(self):
+        """Should report the 30-minute window with the most actions and its count."""
+        actions_by_entity = {
+            "light.living_room": {
+                "turn_on": [
+                    _seconds(2025, 1, 20, 7, 5),
+                    _seconds(2025, 1, 21, 7, 20),
+                    _seconds(2025, 1, 22, 7, 45),
+                    _seconds(2025, 1, 23, 7, 10),
+                ]
+            },
+        }
+
+        result = analyze_patterns(actions_by_entity)["light.living_room"]["turn_on"]
+
+        assert result["total_count"] == 4
+        assert result["most_common_window"] == "07:00"
+        assert result["window_count"] == 3
+        assert result["hours"] == [7, 7, 7, 7]
+        assert result["time_range"] == "07:00"
+
+    def test_tied_windows_resolve_to_earliest_time_of_day(self):
+        """Should pick the earliest window in the day when two windows tie."""
+        actions_by_entity = {
+            "light.kitchen": {
+                "turn_on": [
+                    _seconds(2025, 1, 20, 19, 0),
+                    _seconds(2025, 1, 21, 6, 30),
+                    _seconds(2025, 1, 22, 19, 15),
+                    _seconds(2025, 1, 23, 6, 45),
+                ]
+            },
+        }
+
+        result = analyze_patterns(actions_by_entity)["light.kitchen"]["turn_on"]
+
+        assert result["most_common_window"] == "06:30"
+        assert result["window_count"] == 2
+
+    def test_missing_timestamps_count_toward_total_only(self):
+        """Should count actions without a timestamp but leave them out of windows."""
+        actions_by_entity = {
+            "switch.fan": {
+                "turn_off": [
+                    _seconds(2025, 1, 20, 22, 10),
+                    None,
+                    _seconds(2025, 1, 21, 23, 40),
+                ]
+            },
+        }
+
+        result = analyze_patterns(actions_by_entity)["switch.fan"]["turn_off"]
+
+        assert result["total_count"] == 3
+        assert result["window_count"] == 1
+        assert result["hours"] == [22, 23]
+        assert result["time_range"] == "22:00-23:59"
+
+    def test_skips_actions_without_any_timestamps(self):
+        """Should not report a pattern when no timestamp could be parsed."""
+        actions_by_entity = {"switch.fan": {"turn_off": [None, None]}}
+        assert analyze_patterns(actions_by_entity) == {}
+
+
+# =============================================================================
+# print_summary Function Tests
+# =============================================================================
+
+
+class TestPrintSummary:
+    """Tests for the print_summary function."""
+
+    ACTIONS_BY_ENTITY = {
+        "switch.fan": {"turn_on": [None]},
+        "light.kitchen": {"turn_on": [None, None], "turn_off": [None]},
+    }
+
+    def test_prints_no_actions_message(self, capsys):
+        """Should say so when there are no manual actions."""
+        print_summary({}, {}, 7)
+        assert "No manual actions found" in capsys.readouterr().out
+
+    def test_orders_entities_by_total_actions(self, capsys):
+        """Should list the entity with the most actions first."""
+        print_summary(self.ACTIONS_BY_ENTITY, {}, 7)
+
+        out = capsys.readouterr().out
+        assert out.index("light.kitchen") < out.index("switch.fan")
+        assert "  Actions: 3 total" in out
+
+    def test_precomputed_totals_match_computed_totals(self, capsys):
+        """Should print the same summary whether totals are passed in or counted."""
+        print_summary(self.ACTIONS_BY_ENTITY, {}, 7)
+        computed = capsys.readouterr().out
+
+        print_summary(self.ACTIONS_BY_ENTITY, {}, 7, {"switch.fan": 1, "light.kitchen": 3})
+        precomputed = capsys.readouterr().out
+
+        assert precomputed == computed
+
+
 # =============================================================================
 # API Integration Tests (Mocked)
 # =============================================================================
@@ -734,11 +1107,12 @@ class TestFindAutomationCandidates:
 class TestGetLogbookEntries:
     """Tests for the get_logbook_entries function with mocked requests."""
 
-    @patch("extract_manual_actions.requests.get")
+    @patch("extract_manual_actions._SESSION.get")
     def test_makes_correct_api_call(self, mock_get):
         """Should make correct API call with proper headers and params."""
         mock_response = MagicMock()
         mock_response.json.return_value = []
+        mock_response.content = b"[]"
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
 
@@ -760,7 +1134,7 @@ class TestGetLogbookEntries:
         # Check params
         assert "end_time" in call_args[1]["params"]
 
-    @patch("extract_manual_actions.requests.get")
+    @patch("extract_manual_actions._SESSION.get")
     def test_returns_json_response(self, mock_get):
         """Should return JSON response from API."""
         expected_entries = [
@@ -769,6 +1143,7 @@ class TestGetLogbookEntries:
         ]
         mock_response = MagicMock()
         mock_response.json.return_value = expected_entries
+        mock_response.content = json.dumps(expected_entries).encode()
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
 
@@ -781,11 +1156,12 @@ class TestGetLogbookEntries:
 
         assert result == expected_entries
 
-    @patch("extract_manual_actions.requests.get")
+    @patch("extract_manual_actions._SESSION.get")
     def test_includes_entity_filter_when_provided(self, mock_get):
         """Should include entity filter in params when provided."""
         mock_response = MagicMock()
         mock_response.json.return_value = []
+        mock_response.content = b"[]"
         mock_response.raise_for_status = MagicMock()
         mock_get.return_value = mock_response
 
@@ -804,6 +1180,332 @@ class TestGetLogbookEntries:
         assert call_args[1]["params"]["entity"] == "light.living_room"
 
 
+class TestMainJsonOutput:
+    """Tests for main's --json output."""
+
+    NULL_STATE_ENTRIES = [
+        {
+            "entity_id": "light.x",
+            "state": None,
+            "context_user_id": "user1",
+            "when": f"2025-01-{day}T07:00:00Z",
+        }
+        for day in (20, 21, 22)
+    ]
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_writes_null_actions_as_null_keys(self, use_orjson, capsys, monkeypatch):
+        """Should write an action of None as a "null" key instead of crashing."""
+        if not use_orjson:
+            monkeypatch.setattr("extract_manual_actions.orjson", None)
+
+        with (
+            patch("extract_manual_actions.get_ha_token", return_value="test_token"),
+            patch(
+                "extract_manual_actions.iter_logbook_entries_by_day",
+                return_value=self.NULL_STATE_ENTRIES,
+            ),
+        ):
+            assert main(["--json"]) == 0
+
+        out = capsys.readouterr().out
+        output = json.loads(out[out.index("\n{") :])
+        assert output["actions_by_entity"] == {"light.x": {"null": 3}}
+        assert output["patterns"]["light.x"]["null"]["total_count"] == 3
+
+
+class TestMainEntityFilters:
+    """Tests for how main chooses between the full and the filtered logbook."""
+
+    def _run_main(self, *args):
+        with (
+            patch("sys.argv", ["extract_manual_actions.py", *args]),
+            patch("extract_manual_actions.get_ha_token", return_value="test_token"),
+            patch("extract_manual_actions.iter_logbook_entries_by_day", return_value=[]) as fetch,
+        ):
+            assert main() == 0
+        return fetch.call_args[0][4]
+
+    @patch("extract_manual_actions.get_entity_filters")
+    def test_fetches_full_logbook_by_default(self, mock_filters, capsys):
+        """Should not narrow the logbook to current entities unless asked to."""
+        assert self._run_main() is None
+        mock_filters.assert_not_called()
+
+    @patch("extract_manual_actions.get_entity_filters", return_value=["light.kitchen"])
+    def test_filters_by_current_entities_when_asked(self, mock_filters, capsys):
+        """Should pass the current entity filters on with --filter-by-current-entities."""
+        assert self._run_main("--filter-by-current-entities") == ["light.kitchen"]
+
+    @patch("extract_manual_actions.get_entity_filters")
+    def test_falls_back_to_full_logbook_when_lookup_fails(self, mock_filters, capsys):
+        """Should fetch the full logbook and warn if the entity lookup fails."""
+        mock_filters.side_effect = requests.exceptions.Timeout("timed out")
+
+        assert self._run_main("--filter-by-current-entities") is None
+        assert "fetching all logbook entries" in capsys.readouterr().err
+
+
+class TestSession:
+    """Tests for the shared HTTP session against a local HTTP server."""
+
+    @pytest.fixture
+    def flaky_server(self):
+        """Serve an empty logbook, failing the first request of each path with a 503."""
+        requests_seen = []
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                first = path not in requests_seen
+                requests_seen.append(path)
+                body = b"[]"
+                self.send_response(503 if first else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+        thread.start()
+        try:
+            yield f"http://127.0.0.1:{server.server_address[1]}", requests_seen
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_retries_transient_failures(self, flaky_server):
+        """Should retry a day whose request fails with a 503 instead of failing the run."""
+        base_url, requests_seen = flaky_server
+
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 22, 0, 0, 0)
+
+        result = list(iter_logbook_entries_by_day(base_url, "test_token", start_time, end_time))
+
+        assert result == []
+        # Each of the two days failed once and then succeeded
+        assert len(requests_seen) == 4
+        assert len(set(requests_seen)) == 2
+
+
+class TestGetEntityFilters:
+    """Tests for the get_entity_filters function with mocked requests."""
+
+    STATES = [
+        {"entity_id": "light.kitchen"},
+        {"entity_id": "sensor.temperature"},
+        {"entity_id": "switch.fan"},
+        {"entity_id": "light.hallway"},
+        {"entity_id": None},
+    ]
+
+    def _mock_states(self, mock_get, states):
+        mock_response = MagicMock()
+        mock_response.json.return_value = states
+        mock_response.content = json.dumps(states).encode()
+        mock_get.return_value = mock_response
+
+    @patch("extract_manual_actions.requests.get")
+    def test_queries_states_endpoint(self, mock_get):
+        """Should list entities from the states API with the token."""
+        self._mock_states(mock_get, [])
+
+        get_entity_filters("http://192.168.1.217:8123", "test_token")
+
+        call_args = mock_get.call_args
+        assert call_args[0][0] == "http://192.168.1.217:8123/api/states"
+        assert call_args[1]["headers"]["Authorization"] == "Bearer test_token"
+        assert call_args[1]["timeout"] == STATES_TIMEOUT
+
+    @patch("extract_manual_actions.requests.get")
+    def test_groups_entities_by_domain(self, mock_get):
+        """Should return one filter per domain, skipping other domains."""
+        self._mock_states(mock_get, self.STATES)
+
+        result = get_entity_filters("http://192.168.1.217:8123", "test_token")
+
+        assert result == ["light.kitchen,light.hallway", "switch.fan"]
+
+    @patch("extract_manual_actions.requests.get")
+    def test_splits_long_filters(self, mock_get):
+        """Should split a domain's entities so no filter exceeds max_length."""
+        self._mock_states(mock_get, self.STATES)
+
+        result = get_entity_filters(
+            "http://192.168.1.217:8123", "test_token", domains=("light",), max_length=20
+        )
+
+        assert result == ["light.kitchen", "light.hallway"]
+
+    @patch("extract_manual_actions.requests.get")
+    def test_propagates_http_errors(self, mock_get):
+        """Should raise if the states API fails, so callers can fall back."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        mock_get.return_value = mock_response
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            get_entity_filters("http://192.168.1.217:8123", "test_token")
+
+
+class TestSplitByDay:
+    """Tests for the split_by_day function."""
+
+    def test_splits_range_into_whole_days(self):
+        """Should return one range per day covering the whole period."""
+        start = datetime(2025, 1, 20, 8, 0, 0)
+        end = datetime(2025, 1, 23, 8, 0, 0)
+
+        assert split_by_day(start, end) == [
+            (datetime(2025, 1, 20, 8, 0, 0), datetime(2025, 1, 21, 8, 0, 0)),
+            (datetime(2025, 1, 21, 8, 0, 0), datetime(2025, 1, 22, 8, 0, 0)),
+            (datetime(2025, 1, 22, 8, 0, 0), datetime(2025, 1, 23, 8, 0, 0)),
+        ]
+
+    def test_last_range_is_truncated_to_end_time(self):
+        """Should end the final range at end_time rather than a full day later."""
+        start = datetime(2025, 1, 20, 0, 0, 0)
+        end = datetime(2025, 1, 21, 12, 0, 0)
+
+        ranges = split_by_day(start, end)
+
+        assert ranges[-1] == (datetime(2025, 1, 21, 0, 0, 0), end)
+
+    def test_returns_empty_list_for_empty_range(self):
+        """Should return no ranges when start and end are equal."""
+        start = datetime(2025, 1, 20, 0, 0, 0)
+        assert split_by_day(start, start) == []
+
+
+class TestIterLogbookEntriesByDay:
+    """Tests for the iter_logbook_entries_by_day function with mocked requests."""
+
+    @patch("extract_manual_actions._SESSION.get")
+    def test_makes_one_request_per_day(self, mock_get):
+        """Should query the logbook once for each day in the range."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = []
+        mock_response.content = b"[]"
+        mock_get.return_value = mock_response
+
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 27, 0, 0, 0)
+
+        list(
+            iter_logbook_entries_by_day(
+                "http://192.168.1.217:8123", "test_token", start_time, end_time
+            )
+        )
+
+        assert mock_get.call_count == 7
+
+    @patch("extract_manual_actions.get_logbook_entries")
+    def test_returns_entries_in_day_order(self, mock_get_entries):
+        """Should concatenate each day's entries in chronological order."""
+        mock_get_entries.side_effect = lambda base_url, token, start, end, entity_id: [
+            {"entity_id": "light.living_room", "when": start.isoformat()}
+        ]
+
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 23, 0, 0, 0)
+
+        result = list(
+            iter_logbook_entries_by_day(
+                "http://192.168.1.217:8123", "test_token", start_time, end_time
+            )
+        )
+
+        assert [entry["when"] for entry in result] == [
+            "2025-01-20T00:00:00",
+            "2025-01-21T00:00:00",
+            "2025-01-22T00:00:00",
+        ]
+
+    @patch("extract_manual_actions.get_logbook_entries")
+    def test_only_fetches_ahead_by_the_worker_count(self, mock_get_entries):
+        """Should not request more days than the workers allow ahead of the caller."""
+        mock_get_entries.side_effect = lambda base_url, token, start, end, entity_id: [
+            {"entity_id": "light.living_room", "when": start.isoformat()}
+        ]
+
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 30, 0, 0, 0)
+
+        entries = iter_logbook_entries_by_day(
+            "http://192.168.1.217:8123", "test_token", start_time, end_time, workers=2
+        )
+        first = next(entries)
+        entries.close()
+
+        assert first["when"] == "2025-01-20T00:00:00"
+        # The first day, the one in flight alongside it, and the one sent to
+        # replace it; none of the other seven days
+        assert mock_get_entries.call_count <= 3
+
+    @patch("extract_manual_actions.get_logbook_entries")
+    def test_queries_each_day_once_per_entity_filter(self, mock_get_entries):
+        """Should query every day with every entity filter, in day order."""
+        mock_get_entries.return_value = []
+
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 22, 0, 0, 0)
+
+        list(
+            iter_logbook_entries_by_day(
+                "http://192.168.1.217:8123",
+                "test_token",
+                start_time,
+                end_time,
+                entity_filters=["light.a,light.b", "switch.fan"],
+            )
+        )
+
+        queried = sorted(call.args[2:] for call in mock_get_entries.call_args_list)
+        assert queried == [
+            (datetime(2025, 1, 20), datetime(2025, 1, 21), "light.a,light.b"),
+            (datetime(2025, 1, 20), datetime(2025, 1, 21), "switch.fan"),
+            (datetime(2025, 1, 21), datetime(2025, 1, 22), "light.a,light.b"),
+            (datetime(2025, 1, 21), datetime(2025, 1, 22), "switch.fan"),
+        ]
+
+    @patch("extract_manual_actions.get_logbook_entries")
+    def test_empty_entity_filters_make_no_requests(self, mock_get_entries):
+        """Should not query the logbook when no entities match the domains."""
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 22, 0, 0, 0)
+
+        result = list(
+            iter_logbook_entries_by_day(
+                "http://192.168.1.217:8123", "test_token", start_time, end_time, entity_filters=[]
+            )
+        )
+
+        assert result == []
+        mock_get_entries.assert_not_called()
+
+    @patch("extract_manual_actions._SESSION.get")
+    def test_propagates_http_errors(self, mock_get):
+        """Should raise if any day's request fails."""
+        mock_response = MagicMock()
+        mock_response.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        mock_get.return_value = mock_response
+
+        start_time = datetime(2025, 1, 20, 0, 0, 0)
+        end_time = datetime(2025, 1, 22, 0, 0, 0)
+
+        with pytest.raises(requests.exceptions.HTTPError):
+            list(
+                iter_logbook_entries_by_day(
+                    "http://192.168.1.217:8123", "test_token", start_time, end_time
+                )
+            )
+
+
 class TestGetHaToken:
     """Tests for the get_ha_token function."""
 
@@ -996,8 +1698,8 @@ class TestMalformedLogbookEntries:
             "context_user_id": "user123",
         }
         result = parse_timestamp(entry.get("when"))
-        # Should return None since it's not a string, or handle conversion
-        assert result is None  # Current impl expects string
+        # Epoch seconds are converted to an aware UTC datetime
+        assert result == datetime(2024, 1, 20, 11, 40, tzinfo=UTC)
 
     def test_context_user_id_as_integer(self):
         """context_user_id as integer instead of string."""